@@ -1,8 +1,28 @@
 
 import configparser
+import functools
 import os
 
 from bvzconfigerror import ConfigError
+from bvzfastconfig import FastConfig
+
+# The values validate accepts for a "bool" setting. Anything that does not start with one of the first characters is
+# rejected without having to upper() it.
+_BOOL_FIRST_CHARS = frozenset("TtFf")
+_BOOL_VALUES = frozenset({"TRUE", "FALSE"})
+
+# Accepted boolean spellings. The common lower, title and upper case forms are listed so that most lookups do not need
+# to upper() the value first.
+_TRUE_STRINGS = ("true", "True", "TRUE", "t", "T", "yes", "Yes", "YES", "y", "Y", "on", "On", "ON", "1")
+_FALSE_STRINGS = ("false", "False", "FALSE", "f", "F", "no", "No", "NO", "n", "N", "off", "Off", "OFF", "0")
+_BOOL_MAP = dict.fromkeys(_TRUE_STRINGS, True)
+_BOOL_MAP.update(dict.fromkeys(_FALSE_STRINGS, False))
+
+# Parsed configs shared by every Config in this process, keyed on (absolute path, inode, modification time, size) so
+# that a file that has changed on disk is parsed again (see Config.clear_load_cache for the limits of that). The
+# FastConfig objects in here are never modified. A Config makes its own copy before it changes anything or hands its
+# parser out through delimited_config_obj.
+_CONFIG_CACHE = dict()
 
 
 # ======================================================================================================================
@@ -15,7 +35,7 @@ class Config(object):
     def __init__(self,
                  config_p):
         """
-        Setup this wrapper of the default python config parser.
+        Setup this wrapper of the config parser.
 
         :param config_p:
                 The path to the config file.
@@ -28,71 +48,164 @@ class Config(object):
 
         self.config_p = config_p
 
-        if not os.path.exists(config_p):
+        # A single open both checks that the file exists and identifies it. If this exact version of the file has
+        # already been parsed by another Config, that parse is re-used and the file is not read at all. Otherwise
+        # parsing waits until something actually asks for the contents.
+        try:
+            with open(config_p, "r") as f:
+                st = os.fstat(f.fileno())
+                self._load_key = (os.path.abspath(config_p), st.st_ino, st.st_mtime_ns, st.st_size)
+                self._cached_config_obj = _CONFIG_CACHE.get(self._load_key)
+                self._config_text = f.read() if self._cached_config_obj is None else None
+        except FileNotFoundError:
             msg = "Cannot locate config file: " + os.path.abspath(config_p)
             code = 2
             raise ConfigError(msg, code)
 
-        self.delimited_config_obj = self._read_config_with_delimiters(config_p)
-        self.undelimited_config_obj = self._read_config_without_delimiters(config_p)
+        # True while _config_obj is the copy held in the process-wide cache (and so must not be changed).
+        self._config_is_shared = True
+
+        # Results of previous validate calls, keyed on the (hashable) sections being validated.
+        self._validate_cache = dict()
+
+        # The parser's version number when the validate results above were last known to be current.
+        self._validate_version = None
 
     # ------------------------------------------------------------------------------------------------------------------
     @property
     def config_path(self):
         return self.config_p
 
+    # ------------------------------------------------------------------------------------------------------------------
+    @property
+    def delimited_config_obj(self):
+        """
+        The FastConfig object holding the contents of the config file. Callers may change it directly, so it is always
+        this Config's own copy and never the one shared through the process-wide cache.
+        """
+
+        self._unshare_config()
+
+        return self._config_obj
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @functools.cached_property
+    def _config_obj(self):
+        """
+        The FastConfig object holding the contents of the config file. Parsed on first use (unless another Config has
+        already parsed the same version of the file). This may be the object shared through the process-wide cache, so
+        it must not be changed without calling _unshare_config first.
+        """
+
+        config_obj = self._cached_config_obj
+        if config_obj is None:
+            config_obj = self._read_config_with_delimiters(self._config_text, self.config_p)
+            self._cache_config_obj(self._load_key, config_obj)
+
+        self._cached_config_obj = None
+        self._config_text = None
+
+        return config_obj
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @functools.cached_property
+    def _dict(self):
+        """
+        The parsed config as a plain {section: {option: value}} dictionary. Reads are served directly from this rather
+        than going through the parser's methods. Changes are still made through the parser, which updates this same
+        dictionary.
+        """
+
+        return self._config_obj.as_dict()
+
     # ------------------------------------------------------------------------------------------------------------------
     @staticmethod
-    def _read_config_with_delimiters(config_p):
+    def _uncache_config_obj(abs_path):
         """
-        Opens a config file (given by config_p).
+        Drops every version of a file from the process-wide cache.
 
-        :param config_p:
-                The full path to the config file.
+        :param abs_path:
+                The absolute path to the config file.
 
         :return:
-                A configParser object.
+                Nothing.
         """
 
-        assert type(config_p) is str
+        for key in [key for key in _CONFIG_CACHE if key[0] == abs_path]:
+            del _CONFIG_CACHE[key]
 
-        config_obj = configparser.ConfigParser(allow_no_value=True,
-                                               delimiters="=",
-                                               empty_lines_in_values=True)
+    # ------------------------------------------------------------------------------------------------------------------
+    @staticmethod
+    def _cache_config_obj(load_key,
+                          config_obj):
+        """
+        Stores a parsed config in the process-wide cache, dropping any older versions of the same file.
 
-        # Force configparser to maintain capitalization of keys
-        config_obj.optionxform = str
+        :param load_key:
+                The (absolute path, inode, modification time, size) key of the file that was parsed.
+        :param config_obj:
+                The FastConfig object parsed from that file.
 
-        # Read the config.
-        config_obj.read(config_p)
+        :return:
+                Nothing.
+        """
 
-        return config_obj
+        Config._uncache_config_obj(load_key[0])
+        _CONFIG_CACHE[load_key] = config_obj
 
     # ------------------------------------------------------------------------------------------------------------------
-    @staticmethod
-    def _read_config_without_delimiters(config_p):
+    @classmethod
+    def clear_load_cache(cls):
         """
-        Opens a config file (given by config_p). This disables the delimiter so that items read are read exactly as
-        entered (instead of trying to process key/value pairs).
+        Forgets every parsed config held in the process-wide cache so that the next Config for any file reads and parses
+        it again. Existing Config objects are not affected.
 
-        :param config_p:
-                The full path to the config file.
+        A cached parse is matched to a file by its path, inode, modification time and size. If a file is rewritten
+        with the same size within the file system's modification time resolution (or has its modification time set
+        back with os.utime), the stale parse is still returned. Call this after changing a config file behind the
+        back of this module when that matters.
 
         :return:
-                A configParser object.
+                Nothing.
         """
 
-        assert type(config_p) is str
+        _CONFIG_CACHE.clear()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def _unshare_config(self):
+        """
+        Swaps the shared (cached) parsed config for a private copy, so that changes made through this Config are not
+        seen by any other Config that loaded the same file.
+
+        :return:
+                Nothing.
+        """
+
+        if self._config_is_shared:
+            self._config_obj = self._config_obj.copy()
+            self._dict = self._config_obj.as_dict()
+            self._config_is_shared = False
 
-        config_obj = configparser.ConfigParser(allow_no_value=True,
-                                               delimiters="\n",
-                                               empty_lines_in_values=True)
+    # ------------------------------------------------------------------------------------------------------------------
+    @staticmethod
+    def _read_config_with_delimiters(data,
+                                     source):
+        """
+        Parses the contents of a config file.
+
+        :param data:
+                The text of the config file.
+        :param source:
+                The path the text was read from (used in error messages).
+
+        :return:
+                A FastConfig object.
+        """
 
-        # Force configparser to maintain capitalization of keys
-        config_obj.optionxform = str
+        assert type(data) is str
 
-        # Read the config
-        config_obj.read(config_p)
+        config_obj = FastConfig()
+        config_obj.read_string(data, source)
 
         return config_obj
 
@@ -124,23 +237,58 @@ class Config(object):
         for section in sections:
             assert type(sections[section]) is list or sections[section] is None
 
-        # Check sections (Only checks the delimited version since it is identical to the undelimited version)
-        for section in sections:
-            if not self.delimited_config_obj.has_section(section):
+        # Re-validating the same sections against an unmodified config returns the previous result. Any change to the
+        # parser (including one made directly through delimited_config_obj) bumps its version and discards them all.
+        version = self._config_obj.version
+        if version != self._validate_version:
+            self._validate_cache.clear()
+            self._validate_version = version
+
+        # The rules may be lists rather than tuples (e.g. when loaded from JSON), so each one is converted to make the
+        # key hashable.
+        key = tuple((section, None if sections[section] is None else tuple(tuple(rule) for rule in sections[section]))
+                    for section in sections)
+        if key in self._validate_cache:
+            return self._validate_cache[key]
+
+        result = self._validate(sections)
+        self._validate_cache[key] = result
+
+        return result
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def _validate(self,
+                  sections):
+        """
+        Does the actual work of validate (without caching the result).
+
+        :param sections:
+                The same dictionary of sections and items that was passed to validate.
+
+        :return:
+                The same result that validate returns.
+        """
+
+        config_dict = self._dict
+
+        # Check sections
+        for section, settings in sections.items():
+            options = config_dict.get(section)
+            if options is None:
                 return section, None, None
 
-            if sections[section] is not None:
-                for setting, setting_type in sections[section]:
+            if settings is not None:
+                for setting, setting_type in settings:
                     if setting:
-                        if not self.delimited_config_obj.has_option(section, setting):
+                        if setting not in options:
                             return section, setting, None
+                        value = options[setting]
                         if setting_type == "bool":
-                            if not self.delimited_config_obj.get(section, setting).upper() in ["TRUE", "FALSE"]:
+                            if not value or value[0] not in _BOOL_FIRST_CHARS or value.upper() not in _BOOL_VALUES:
                                 return section, setting, "boolean"
                         if setting_type == "int":
-                            try:
-                                int(self.delimited_config_obj.get(section, setting))
-                            except ValueError:
+                            digits = value[1:] if value and value[0] in "-+" else value
+                            if not digits or not digits.isdecimal():
                                 return section, setting, "integer"
 
         # All good
@@ -159,11 +307,11 @@ class Config(object):
                 A list containing all of the items in this section. One line = 1 item in the list.
         """
 
-        assert type(section) is str
-
-        items = [value[0] for value in self.undelimited_config_obj.items(section)]
-
-        return items
+        # The parser already keeps each section's lines as a list, so this is only a copy of the stored list.
+        try:
+            return list(self._config_obj.section_lines(section))
+        except configparser.NoSectionError:
+            return list()
 
     # ------------------------------------------------------------------------------------------------------------------
     def _get_item(self,
@@ -181,19 +329,18 @@ class Config(object):
                 The value of the item for this section.
         """
 
-        assert type(section) is str
-        assert type(item) is str
-
-        value = self.delimited_config_obj.get(section, item)
-
-        return value
+        try:
+            return self._dict[section][item]
+        except KeyError:
+            # Let the parser raise the usual NoSectionError or NoOptionError
+            return self._config_obj.get(section, item)
 
     # ------------------------------------------------------------------------------------------------------------------
     def has_option(self,
                    section,
                    item):
         """
-        Returns True if the section and item exists. Essentially a wrapper for the configparser has_option function.
+        Returns True if the section and item exists.
 
         :param section:
                 The section.
@@ -204,27 +351,22 @@ class Config(object):
                 True if the section and item exist. False otherwise.
         """
 
-        assert type(section) is str
-        assert type(item) is str
-
-        return self.delimited_config_obj.has_option(section, item)
+        return item in self._dict.get(section, ())
 
     # ------------------------------------------------------------------------------------------------------------------
     def options(self,
                 section):
         """
-        Just a wrapper for the config parser options function.
+        Returns the names of the options in a section.
 
         :param section:
                 The section we want the options from.
 
         :return:
-                A list of options.
+                A list of options. The list is empty if the section does not exist.
         """
 
-        assert type(section) is str
-
-        return self.delimited_config_obj.options(section)
+        return list(self._dict.get(section, ()))
 
     # ------------------------------------------------------------------------------------------------------------------
     def get_string(self,
@@ -243,9 +385,6 @@ class Config(object):
                 The value of the item for this section.
         """
 
-        assert type(section) is str
-        assert type(item) is str
-
         result = self._get_item(section, item)
         if result is None:
             result = ""
@@ -269,9 +408,6 @@ class Config(object):
                 ValueError is raised.
         """
 
-        assert type(section) is str
-        assert type(item) is str
-
         return int(self._get_item(section, item))
 
     # ------------------------------------------------------------------------------------------------------------------
@@ -292,15 +428,14 @@ class Config(object):
                 Yes, No (and their case variants), 0 and 1. Any other values will trigger a ValueError.
         """
 
-        assert type(section) is str
-        assert type(item) is str
-
         value = self._get_item(section, item)
-        if value.upper() in ["TRUE", "T", "YES", "Y", "ON", "1"]:
-            return True
-        if value.upper() in ["FALSE", "F", "NO", "N", "OFF", "0"]:
-            return False
-        raise ValueError()
+        result = _BOOL_MAP.get(value)
+        if result is None:
+            result = _BOOL_MAP.get(value.upper())
+            if result is None:
+                raise ValueError()
+
+        return result
 
     # ------------------------------------------------------------------------------------------------------------------
     def replace_section(self,
@@ -317,19 +452,16 @@ class Config(object):
                 A dictionary of items where the key is the option name and the value is the value.
 
         :return:
-                Nothing.
+                Nothing. Raises a ValueError (and leaves the section unchanged) if any of the names or values contain a
+                line break.
         """
 
         assert type(section) is str
         assert type(items) is dict
 
-        self.delimited_config_obj.remove_section(section)
-        self.undelimited_config_obj.remove_section(section)
+        self._unshare_config()
 
-        self.delimited_config_obj.add_section(section)
-        self.undelimited_config_obj.add_section(section)
-
-        self.merge_section(section, items)
+        self._config_obj.update_section(section, {key: str(value) for key, value in items.items()}, replace=True)
 
     # ------------------------------------------------------------------------------------------------------------------
     def merge_section(self,
@@ -349,16 +481,16 @@ class Config(object):
                 A dictionary of items where the key is the option name and the value is the value.
 
         :return:
-                Nothing.
+                Nothing. Raises a ValueError (and leaves the section unchanged) if any of the names or values contain a
+                line break.
         """
 
         assert type(section) is str
         assert type(items) is dict
 
-        for key, value in items.items():
-            self.delimited_config_obj.set(section, key, str(value))
-            self.undelimited_config_obj.set(section, key, str(value))
-        pass
+        self._unshare_config()
+
+        self._config_obj.update_section(section, {key: str(value) for key, value in items.items()})
 
     # ------------------------------------------------------------------------------------------------------------------
     def get_config_path(self):
@@ -374,11 +506,18 @@ class Config(object):
     # ------------------------------------------------------------------------------------------------------------------
     def save(self):
         """
-        Saves the existing configparser back to disk.
+        Saves the existing config back to disk.
 
         :return:
                 Nothing.
         """
 
+        # Build the whole file in memory first so that it goes to disk in one write (and an error while building it
+        # does not leave a truncated file behind).
+        data = self._config_obj.to_string()
+
         with open(self.config_p, "w") as f:
-            self.delimited_config_obj.write(f)
+            f.write(data)
+
+        # Any cached parse of this file is now out of date.
+        self._uncache_config_obj(self._load_key[0])
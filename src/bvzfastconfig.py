@@ -0,0 +1,458 @@
+
+import configparser
+import re
+import sys
+
+# Compiled once at import. Matches either a section header (group 1) or any other non-blank, non-comment line (group
+# 2). Blank lines and comments never match, so they are skipped by the scan itself. As with configparser, a header runs
+# from the first "[" to the last "]" on the line and anything after that is ignored. A line that starts with "[" but
+# has no closing "]" is an ordinary line. Leading whitespace is any whitespace character other than a newline (the
+# same set the first character of a line is tested against), so a line indented with e.g. a non-breaking space is not
+# dropped. The line itself is captured greedily up to the newline and the trailing whitespace (including the "\r" of
+# CRLF line endings) is stripped afterwards; matching it in the pattern would make long runs of spaces quadratic.
+_LINE_RE = re.compile(r"^[^\S\n]*(?:\[([^\n]+)\][^\]\n]*|([^\s#;][^\n]*))$", re.M)
+
+
+# ======================================================================================================================
+class FastConfig(object):
+    """
+    A minimal replacement for configparser.ConfigParser that covers only what Config needs: sections, key = value pairs
+    (or bare keys with no value), and comments. It reads files the way Config used to configure ConfigParser (only "="
+    is a delimiter, so a line like "k: v" is a bare key named "k: v", and option names keep their case), and raises the
+    same configparser exceptions for a missing section header, a duplicate section, a duplicate option within a
+    section, an empty option name, and a missing section or option on lookup.
+
+    Differences from ConfigParser:
+        - There is no interpolation. Values containing "%" are returned as written.
+        - There is no DEFAULT section. A [DEFAULT] header is just another section.
+        - There are no multi-line values. An indented line is read as a line (and option) of its own rather than as a
+          continuation of the value above it.
+        - A file with errors raises on the first one, rather than after collecting all of them.
+
+    Each section is stored as the list of its lines exactly as entered, and as a plain {option: value} dictionary split
+    out of those lines while parsing. Once a section has been changed through set(), its lines are rebuilt from the
+    dictionary (in "key = value" form) the next time they are needed.
+    """
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def __init__(self):
+        """
+        Setup an empty config.
+
+        :return:
+                Nothing.
+        """
+
+        # Section name -> list of lines (None if the lines need to be rebuilt from the options).
+        self._lines = dict()
+
+        # Section name -> {option: value}.
+        self._options = dict()
+
+        # Incremented every time the contents change, so that callers holding values derived from this config can tell
+        # when those values are out of date.
+        self.version = 0
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def read_string(self,
+                    data,
+                    source="<string>"):
+        """
+        Parses the text of a config file in a single regex scan that yields section headers and lines in order.
+
+        :param data:
+                The text of the config file.
+        :param source:
+                The name of the file the text came from. Only used in error messages.
+
+        :return:
+                Nothing.
+        """
+
+        assert type(data) is str
+
+        self.version += 1
+
+        section = None
+        lines = None
+        options = None
+        sections_read = set()
+
+        for match in _LINE_RE.finditer(data):
+            header, line = match.groups()
+            if header:
+                section = sys.intern(header)
+                if section in sections_read:
+                    raise configparser.DuplicateSectionError(section, source, self._line_number(data, match))
+                sections_read.add(section)
+                if section not in self._lines:
+                    self._lines[section] = list()
+                    self._options[section] = dict()
+                lines = self.section_lines(section)
+                options = self._options[section]
+                continue
+
+            line = line.rstrip()
+            if lines is None:
+                raise configparser.MissingSectionHeaderError(source, self._line_number(data, match), line)
+
+            option, value = self._split_kv(line)
+            if not option:
+                error = configparser.ParsingError(source)
+                error.append(self._line_number(data, match), repr(line))
+                raise error
+            if option in options:
+                raise configparser.DuplicateOptionError(section, option, source, self._line_number(data, match))
+
+            lines.append(line)
+            options[option] = value
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @staticmethod
+    def _line_number(data,
+                     match):
+        """
+        Works out which line of the text a match starts on. Only needed when reporting an error.
+
+        :param data:
+                The text of the config file.
+        :param match:
+                A match from _LINE_RE.
+
+        :return:
+                The (1-based) line number.
+        """
+
+        return data.count("\n", 0, match.start()) + 1
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @staticmethod
+    def _split_kv(line):
+        """
+        Splits a line into an option and its value on the first "=". The option name is interned so that lookups with
+        a literal (and therefore already interned) name match on identity without a full string compare.
+
+        :param line:
+                The line to split.
+
+        :return:
+                A tuple of (option, value). The value is None if the line has no "=".
+        """
+
+        option, delimiter, value = line.partition("=")
+        if not delimiter:
+            return sys.intern(line), None
+        return sys.intern(option.rstrip()), value.lstrip()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @staticmethod
+    def _check_single_line(*texts):
+        """
+        Makes sure none of the given section names, option names or values contain a line break. There are no
+        multi-line values, so a line break would be written out as the start of a new line and the file would not read
+        back the same way (or at all).
+
+        :param texts:
+                The strings to check. Anything that is not a string (e.g. a None value) is ignored.
+
+        :return:
+                Nothing. Raises a ValueError if any of the strings contain a line break.
+        """
+
+        for text in texts:
+            if type(text) is str and ("\n" in text or "\r" in text):
+                raise ValueError("Config names and values cannot contain line breaks: " + repr(text))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def _get_section(self,
+                     section):
+        """
+        Returns the dictionary of options for a section.
+
+        :param section:
+                The name of the section.
+
+        :return:
+                The dictionary of options for this section. Raises a NoSectionError if the section does not exist.
+        """
+
+        try:
+            return self._options[section]
+        except KeyError:
+            raise configparser.NoSectionError(section)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def section_lines(self,
+                      section):
+        """
+        Returns the lines of a section exactly as entered. Blank lines and comments are not included.
+
+        :param section:
+                The name of the section.
+
+        :return:
+                The list of lines in this section. This is the stored list, not a copy. Raises a NoSectionError if the
+                section does not exist.
+        """
+
+        try:
+            lines = self._lines[section]
+        except KeyError:
+            raise configparser.NoSectionError(section)
+
+        if lines is None:
+            lines = self._lines[section] = [option if value is None else option + " = " + value
+                                            for option, value in self._options[section].items()]
+
+        return lines
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def copy(self):
+        """
+        Returns an independent copy of this config. Changes made to either one do not show up in the other.
+
+        :return:
+                A new FastConfig object.
+        """
+
+        config_obj = FastConfig()
+        config_obj._lines = {section: None if lines is None else list(lines) for section, lines in self._lines.items()}
+        config_obj._options = {section: dict(options) for section, options in self._options.items()}
+        config_obj.version = self.version
+
+        return config_obj
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def as_dict(self):
+        """
+        Returns the parsed config as a plain dictionary for callers that want to do their own (faster) lookups. This is
+        the live dictionary, not a copy, and must not be modified directly.
+
+        :return:
+                A dictionary where the key is the section name and the value is a dictionary of {option: value}.
+        """
+
+        return self._options
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def sections(self):
+        """
+        Returns the names of all of the sections, in the order they were read or added.
+
+        :return:
+                A list of the section names.
+        """
+
+        return list(self._lines)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def has_section(self,
+                    section):
+        """
+        Returns whether a section exists.
+
+        :param section:
+                The name of the section.
+
+        :return:
+                True if the section exists. False otherwise.
+        """
+
+        return section in self._lines
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def add_section(self,
+                    section):
+        """
+        Adds a new, empty section. Raises a DuplicateSectionError if the section already exists, or a ValueError if the
+        name contains a line break.
+
+        :param section:
+                The name of the section to add.
+
+        :return:
+                Nothing.
+        """
+
+        if section in self._lines:
+            raise configparser.DuplicateSectionError(section)
+        self._check_single_line(section)
+
+        self._lines[section] = list()
+        self._options[section] = dict()
+        self.version += 1
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def remove_section(self,
+                       section):
+        """
+        Removes a section and all of its options.
+
+        :param section:
+                The name of the section to remove.
+
+        :return:
+                True if the section existed. False otherwise.
+        """
+
+        self.version += 1
+        self._options.pop(section, None)
+        return self._lines.pop(section, False) is not False
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def has_option(self,
+                   section,
+                   option):
+        """
+        Returns whether a section exists and contains an option.
+
+        :param section:
+                The name of the section.
+        :param option:
+                The name of the option.
+
+        :return:
+                True if the section exists and contains the option. False otherwise.
+        """
+
+        return option in self._options.get(section, ())
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def options(self,
+                section):
+        """
+        Returns the names of the options in a section. Raises a NoSectionError if the section does not exist.
+
+        :param section:
+                The name of the section.
+
+        :return:
+                A list of the option names in this section.
+        """
+
+        return list(self._get_section(section))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def get(self,
+            section,
+            option):
+        """
+        Returns the value of an option.
+
+        :param section:
+                The name of the section that contains the option.
+        :param option:
+                The name of the option.
+
+        :return:
+                The value of the option (None if the option was given without a value). Raises a NoSectionError or a
+                NoOptionError if either is missing.
+        """
+
+        options = self._get_section(section)
+        try:
+            return options[option]
+        except KeyError:
+            raise configparser.NoOptionError(option, section)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def items(self,
+              section):
+        """
+        Returns the options in a section along with their values. Raises a NoSectionError if the section does not exist.
+
+        :param section:
+                The name of the section.
+
+        :return:
+                A list of (option, value) tuples for this section.
+        """
+
+        return list(self._get_section(section).items())
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def set(self,
+            section,
+            option,
+            value):
+        """
+        Sets the value of an option. The section must already exist. Raises a ValueError if the option name or the
+        value contains a line break.
+
+        :param section:
+                The name of the section that contains the option.
+        :param option:
+                The name of the option.
+        :param value:
+                The value to set.
+
+        :return:
+                Nothing.
+        """
+
+        self._check_single_line(option, value)
+
+        self._get_section(section)[option] = value
+        self._lines[section] = None
+        self.version += 1
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def update_section(self,
+                       section,
+                       options,
+                       replace=False):
+        """
+        Sets the values of several options in one go. Unlike set, the section is created if it does not exist. Raises a
+        ValueError (without changing anything) if the section name, or any of the option names or values, contains a
+        line break.
+
+        :param section:
+                The name of the section that contains the options.
+        :param options:
+                A dictionary of {option: value} to set.
+        :param replace:
+                If True, the existing section (if any) is removed first, so that it ends up holding only these options.
+
+        :return:
+                Nothing.
+        """
+
+        self._check_single_line(section)
+        for option, value in options.items():
+            self._check_single_line(option, value)
+
+        if replace:
+            self._options.pop(section, None)
+            self._lines.pop(section, None)
+
+        self._options.setdefault(section, dict()).update(options)
+        self._lines[section] = None
+        self.version += 1
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def to_string(self):
+        """
+        Serializes the config: each section header followed by the lines of that section, and a blank line after each
+        section.
+
+        :return:
+                The text of the config file.
+        """
+
+        return "".join("[" + section + "]\n" + "".join(line + "\n" for line in self.section_lines(section)) + "\n"
+                       for section in self._lines)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def write(self,
+              fileobject):
+        """
+        Writes the config out with a single write call.
+
+        :param fileobject:
+                The open (text mode) file object to write to.
+
+        :return:
+                Nothing.
+        """
+
+        fileobject.write(self.to_string())
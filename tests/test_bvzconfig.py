@@ -0,0 +1,243 @@
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from bvzconfig import Config
+
+CONFIG_TEXT = """[main]
+count = 5
+flag = True
+name = hello world
+
+[paths]
+/usr/local/bin
+/opt/thing
+"""
+
+
+# ======================================================================================================================
+class ConfigTestCase(unittest.TestCase):
+    """
+    Writes a fresh config file to a temporary directory for each test, and starts each test with an empty load cache.
+    """
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def setUp(self):
+        self.temp_d = tempfile.mkdtemp()
+        self.config_p = os.path.join(self.temp_d, "config.ini")
+        self.write_config(CONFIG_TEXT)
+        Config.clear_load_cache()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def tearDown(self):
+        Config.clear_load_cache()
+        shutil.rmtree(self.temp_d)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def write_config(self, text):
+        with open(self.config_p, "w") as f:
+            f.write(text)
+
+
+# ======================================================================================================================
+class TestSave(ConfigTestCase):
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_save_then_reload(self):
+        config_obj = Config(self.config_p)
+        config_obj.merge_section("main", {"count": 7, "new": "value"})
+        config_obj.replace_section("other", {"a": 1})
+        config_obj.save()
+
+        reloaded_obj = Config(self.config_p)
+        self.assertEqual(7, reloaded_obj.get_integer("main", "count"))
+        self.assertEqual("value", reloaded_obj.get_string("main", "new"))
+        self.assertEqual("hello world", reloaded_obj.get_string("main", "name"))
+        self.assertEqual(["/usr/local/bin", "/opt/thing"], reloaded_obj.get_list("paths"))
+        self.assertEqual(["a"], reloaded_obj.options("other"))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_line_breaks_are_rejected(self):
+        config_obj = Config(self.config_p)
+
+        for section, items in (("main", {"desc": "line1\nline2"}),
+                               ("main", {"desc": "a\nx = 2"}),
+                               ("main", {"desc": "a\rb"}),
+                               ("main", {"two\nlines": "x"}),
+                               ("two\nlines", {"a": "x"})):
+            with self.subTest(section=section, items=items):
+                with self.assertRaises(ValueError):
+                    config_obj.merge_section(section, items)
+                with self.assertRaises(ValueError):
+                    config_obj.replace_section(section, items)
+
+        # Nothing was changed by the failed calls, so the file still saves and reads back as it was.
+        config_obj.save()
+        reloaded_obj = Config(self.config_p)
+        self.assertEqual(["count", "flag", "name"], reloaded_obj.options("main"))
+        self.assertEqual(["main", "paths"], reloaded_obj.delimited_config_obj.sections())
+
+
+# ======================================================================================================================
+class TestLoadCache(ConfigTestCase):
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_changes_are_not_shared(self):
+        first_obj = Config(self.config_p)
+        second_obj = Config(self.config_p)
+
+        # Both read the same parse from the cache to start with.
+        self.assertEqual("hello world", first_obj.get_string("main", "name"))
+        self.assertEqual("hello world", second_obj.get_string("main", "name"))
+
+        first_obj.merge_section("main", {"name": "merged"})
+        first_obj.replace_section("paths", {"dest": "/replaced"})
+        first_obj.delimited_config_obj.set("main", "count", "6")
+
+        self.assertEqual("merged", first_obj.get_string("main", "name"))
+        self.assertEqual(6, first_obj.get_integer("main", "count"))
+        self.assertEqual(["dest = /replaced"], first_obj.get_list("paths"))
+
+        self.assertEqual("hello world", second_obj.get_string("main", "name"))
+        self.assertEqual(5, second_obj.get_integer("main", "count"))
+        self.assertEqual(["/usr/local/bin", "/opt/thing"], second_obj.get_list("paths"))
+
+        # Nor by a Config created afterwards from the cache.
+        third_obj = Config(self.config_p)
+        self.assertEqual("hello world", third_obj.get_string("main", "name"))
+        self.assertEqual(5, third_obj.get_integer("main", "count"))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_delimited_config_obj_is_not_the_cached_parse(self):
+        first_obj = Config(self.config_p)
+        second_obj = Config(self.config_p)
+
+        first_obj.delimited_config_obj.set("main", "name", "changed")
+
+        self.assertEqual("hello world", second_obj.delimited_config_obj.get("main", "name"))
+        self.assertIsNot(first_obj.delimited_config_obj, second_obj.delimited_config_obj)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_save_drops_the_cached_parse(self):
+        config_obj = Config(self.config_p)
+        config_obj.merge_section("main", {"name": "saved"})
+        config_obj.save()
+
+        self.assertEqual("saved", Config(self.config_p).get_string("main", "name"))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_size_change_forces_a_new_parse(self):
+        self.assertEqual(5, Config(self.config_p).get_integer("main", "count"))
+
+        st = os.stat(self.config_p)
+        self.write_config(CONFIG_TEXT.replace("count = 5", "count = 500"))
+        os.utime(self.config_p, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        self.assertEqual(500, Config(self.config_p).get_integer("main", "count"))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_mtime_change_forces_a_new_parse(self):
+        self.assertEqual(5, Config(self.config_p).get_integer("main", "count"))
+
+        st = os.stat(self.config_p)
+        self.write_config(CONFIG_TEXT.replace("count = 5", "count = 6"))
+        os.utime(self.config_p, ns=(st.st_atime_ns, st.st_mtime_ns + 1000000000))
+
+        self.assertEqual(6, Config(self.config_p).get_integer("main", "count"))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_clear_load_cache(self):
+        self.assertEqual(5, Config(self.config_p).get_integer("main", "count"))
+
+        # Same size and the old modification time: indistinguishable from the cached version.
+        st = os.stat(self.config_p)
+        self.write_config(CONFIG_TEXT.replace("count = 5", "count = 6"))
+        os.utime(self.config_p, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        self.assertEqual(5, Config(self.config_p).get_integer("main", "count"))
+
+        Config.clear_load_cache()
+        self.assertEqual(6, Config(self.config_p).get_integer("main", "count"))
+
+
+# ======================================================================================================================
+class TestValidate(ConfigTestCase):
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_list_rules(self):
+        # Rules loaded from JSON arrive as lists rather than tuples.
+        config_obj = Config(self.config_p)
+        sections = {"main": [["count", "int"], ["flag", "bool"]], "paths": None}
+
+        self.assertIsNone(config_obj.validate(sections))
+        self.assertIsNone(config_obj.validate(sections))
+        self.assertEqual(("main", "name", "integer"), config_obj.validate({"main": [["name", "int"]]}))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_results(self):
+        config_obj = Config(self.config_p)
+
+        self.assertIsNone(config_obj.validate({"main": [("count", "int"), ("flag", "bool")]}))
+        self.assertEqual(("missing", None, None), config_obj.validate({"missing": None}))
+        self.assertEqual(("main", "missing", None), config_obj.validate({"main": [("missing", "str")]}))
+        self.assertEqual(("main", "name", "boolean"), config_obj.validate({"main": [("name", "bool")]}))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_repeated_call_is_memoised(self):
+        config_obj = Config(self.config_p)
+        sections = {"main": [("count", "int")]}
+
+        self.assertIsNone(config_obj.validate(sections))
+
+        calls = list()
+        validate = config_obj._validate
+        config_obj._validate = lambda sections: calls.append(sections) or validate(sections)
+
+        self.assertIsNone(config_obj.validate(sections))
+        self.assertIsNone(config_obj.validate({"main": [("count", "int")]}))
+        self.assertEqual([], calls)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_merge_section_invalidates_memo(self):
+        config_obj = Config(self.config_p)
+        sections = {"main": [("count", "int")], "extra": None}
+
+        self.assertEqual(("extra", None, None), config_obj.validate(sections))
+
+        config_obj.merge_section("extra", {"a": 1})
+        self.assertIsNone(config_obj.validate(sections))
+
+        config_obj.merge_section("main", {"count": "many"})
+        self.assertEqual(("main", "count", "integer"), config_obj.validate(sections))
+
+
+# ======================================================================================================================
+class TestGetters(ConfigTestCase):
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_values_follow_direct_parser_changes(self):
+        config_obj = Config(self.config_p)
+
+        self.assertEqual(5, config_obj.get_integer("main", "count"))
+        self.assertTrue(config_obj.get_boolean("main", "flag"))
+        self.assertIsNone(config_obj.validate({"main": [("count", "int")]}))
+
+        config_obj.delimited_config_obj.set("main", "count", "6")
+        config_obj.delimited_config_obj.set("main", "flag", "no")
+
+        self.assertEqual(6, config_obj.get_integer("main", "count"))
+        self.assertFalse(config_obj.get_boolean("main", "flag"))
+
+        config_obj.delimited_config_obj.set("main", "count", "six")
+        self.assertEqual(("main", "count", "integer"), config_obj.validate({"main": [("count", "int")]}))
+        with self.assertRaises(ValueError):
+            config_obj.get_integer("main", "count")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+
+import configparser
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from bvzfastconfig import FastConfig
+
+FIXTURES_D = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+def read_fixture(name):
+    """
+    Returns the text of a fixture file with its line endings left exactly as they are on disk.
+    """
+
+    with open(os.path.join(FIXTURES_D, name), "r", encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+def configparser_options(data):
+    """
+    Parses the text the way Config used to (with delimiters) and returns {section: {option: value}}.
+    """
+
+    config_obj = configparser.ConfigParser(allow_no_value=True,
+                                           delimiters="=",
+                                           empty_lines_in_values=True)
+    config_obj.optionxform = str
+    config_obj.read_string(data)
+
+    return {section: {option: config_obj.get(section, option, raw=True) for option in config_obj.options(section)}
+            for section in config_obj.sections()}
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+def configparser_lines(data):
+    """
+    Parses the text the way Config used to for get_list (without delimiters) and returns {section: [lines]}.
+    """
+
+    config_obj = configparser.ConfigParser(allow_no_value=True,
+                                           delimiters="\n",
+                                           empty_lines_in_values=True)
+    config_obj.optionxform = str
+    config_obj.read_string(data)
+
+    return {section: [value[0] for value in config_obj.items(section)] for section in config_obj.sections()}
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+def fastconfig(data):
+    """
+    Parses the text with FastConfig.
+    """
+
+    config_obj = FastConfig()
+    config_obj.read_string(data)
+
+    return config_obj
+
+
+# ======================================================================================================================
+class TestMatchesConfigParser(unittest.TestCase):
+    """
+    FastConfig must read the fixture files exactly as the ConfigParser setup it replaced did.
+    """
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def assert_same_as_configparser(self, name):
+        data = read_fixture(name)
+        config_obj = fastconfig(data)
+
+        self.assertEqual(configparser_options(data), config_obj.as_dict())
+        self.assertEqual(list(configparser_options(data)), config_obj.sections())
+
+        expected_lines = configparser_lines(data)
+        for section in config_obj.sections():
+            self.assertEqual(expected_lines[section], config_obj.section_lines(section))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_basic(self):
+        self.assert_same_as_configparser("basic.ini")
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_crlf(self):
+        self.assert_same_as_configparser("crlf.ini")
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_unusual_whitespace(self):
+        self.assert_same_as_configparser("whitespace.ini")
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_long_whitespace_run_is_linear(self):
+        # With a lazy capture followed by a trailing whitespace match, this line took time quadratic in the run length.
+        data = "[main]\nkey = a" + " " * 200000 + "b\n"
+        start = time.perf_counter()
+        config_obj = fastconfig(data)
+
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual("a" + " " * 200000 + "b", config_obj.get("main", "key"))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_header_with_trailing_text(self):
+        config_obj = fastconfig("[a]\nx=1\n[b] ; note\ny=2\n")
+
+        self.assertEqual({"a": {"x": "1"}, "b": {"y": "2"}}, config_obj.as_dict())
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_bare_and_colon_keys(self):
+        config_obj = fastconfig(read_fixture("basic.ini"))
+
+        self.assertIsNone(config_obj.get("main", "bare"))
+        self.assertIsNone(config_obj.get("main", "colon: not a delimiter"))
+        self.assertEqual("", config_obj.get("main", "empty"))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_errors(self):
+        for name, error in (("duplicate_option.ini", configparser.DuplicateOptionError),
+                            ("duplicate_section.ini", configparser.DuplicateSectionError),
+                            ("empty_option.ini", configparser.ParsingError),
+                            ("missing_header.ini", configparser.MissingSectionHeaderError)):
+            data = read_fixture(name)
+            with self.subTest(name=name):
+                with self.assertRaises(error):
+                    configparser_options(data)
+                with self.assertRaises(error):
+                    fastconfig(data)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_lookup_errors(self):
+        config_obj = fastconfig(read_fixture("basic.ini"))
+
+        with self.assertRaises(configparser.NoSectionError):
+            config_obj.get("missing", "count")
+        with self.assertRaises(configparser.NoOptionError):
+            config_obj.get("main", "missing")
+
+
+if __name__ == "__main__":
+    unittest.main()